@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import plotly.io as pio
+from plotly.colors import qualitative
 import io
+import os
+from collections import namedtuple
 
 # Set page configuration
 st.set_page_config(
@@ -36,31 +37,572 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Shared layout for every chart, layered on top of the default plotly theme
+pio.templates["dashboard"] = go.layout.Template(layout=dict(
+    height=400,
+    showlegend=False,
+    margin=dict(l=40, r=10, t=40, b=40)
+))
+pio.templates.default = "plotly+dashboard"
+
+DATA_FILE = "sales_data_sample (1).csv"
+# Preprocessed copy of DATA_FILE, rebuilt whenever the CSV is newer.
+# Bump the version tag whenever the preprocessing in read_sales_data changes.
+PARQUET_FILE = "sales_data.v2.parquet"
+
+# Above this many rows the quantity vs price scatter is binned into a heatmap
+SCATTER_MAX_POINTS = 5000
+
+VIEWS = ["📊 Sales Analysis", "🏷️ Product Performance", "👥 Customer Insights", "📅 Time Analysis"]
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# String columns used for filtering and grouping, stored as categoricals
+CATEGORY_COLUMNS = ['PRODUCTLINE', 'DEALSIZE', 'COUNTRY', 'CUSTOMERNAME', 'PRODUCTCODE', 'MonthName']
+
+def current_data_version():
+    """Modification time of DATA_FILE, or None if it is missing.
+    
+    Every cached function below takes it as its first argument, so their caches are
+    keyed on the data they were built from and an updated CSV is picked up.
+    """
+    if not os.path.exists(DATA_FILE):
+        return None
+    return os.path.getmtime(DATA_FILE)
+
+def load_data(data_version):
+    """Load and preprocess the sales data for the given data version"""
+    loaded_version, df = read_sales_data()
+    if loaded_version != data_version:
+        # Drop the stale copy, on disk too, so only one version of the data is ever kept
+        read_sales_data.clear()
+        loaded_version, df = read_sales_data()
+    return df
+
 # Load and cache data
-@st.cache_data
-def load_data():
-    """Load and preprocess the sales data"""
+@st.cache_data(persist="disk")
+def read_sales_data():
+    """Read and preprocess DATA_FILE, returning its modification time along with the data"""
+    data_mtime = os.path.getmtime(DATA_FILE)
+    if os.path.exists(PARQUET_FILE) and os.path.getmtime(PARQUET_FILE) >= data_mtime:
+        return data_mtime, pd.read_parquet(PARQUET_FILE)
+    
+    df = pd.read_csv(DATA_FILE, encoding='latin1')
+    
+    # Data preprocessing
+    df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'])
+    df['Year'] = df['ORDERDATE'].dt.year
+    df['Month'] = df['ORDERDATE'].dt.month
+    df['MonthName'] = df['ORDERDATE'].dt.month_name()
+    df['Quarter'] = df['ORDERDATE'].dt.quarter
+    df['Weekday'] = df['ORDERDATE'].dt.day_name().astype(pd.CategoricalDtype(WEEKDAYS, ordered=True))
+    
+    # Categorical codes make filtering and grouping much cheaper than strings
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    df['ORDERNUMBER'] = df['ORDERNUMBER'].astype('int32')
+    
+    # Small ints hold these exactly; SALES/PRICEEACH stay float64 for display and export
+    df['QUANTITYORDERED'] = df['QUANTITYORDERED'].astype('int16')
+    df['Year'] = df['Year'].astype('int16')
+    df['Month'] = df['Month'].astype('int8')
+    df['Quarter'] = df['Quarter'].astype('int8')
+    
+    # Remove columns with high missing values if they exist
+    columns_to_drop = ['ADDRESSLINE2', 'STATE', 'TERRITORY']
+    existing_columns = [col for col in columns_to_drop if col in df.columns]
+    if existing_columns:
+        df.drop(columns=existing_columns, inplace=True)
+    
+    # Keep rows in date order so resampling and time-series plots skip a sort
+    df = df.sort_values('ORDERDATE', kind='mergesort').reset_index(drop=True)
+    
+    # Save the preprocessed data so later cold starts skip CSV parsing
     try:
-        df = pd.read_csv("sales_data_sample (1).csv", encoding='latin1')
+        df.to_parquet(PARQUET_FILE, compression='zstd')
+    except OSError:
+        # e.g. a read-only deploy directory; the CSV is simply parsed again next time
+        pass
+    
+    return data_mtime, df
+
+@st.cache_resource(max_entries=1)
+def load_arrays(data_version):
+    """NumPy column arrays and category labels of the raw data, shared across reruns"""
+    df = load_data(data_version)
+    arrays = {
+        'Year': df['Year'].to_numpy(),
+        'ORDERDATE': df['ORDERDATE'].to_numpy(),
+        'SALES': df['SALES'].to_numpy(),
+        'QUANTITYORDERED': df['QUANTITYORDERED'].to_numpy()
+    }
+    categories = {}
+    for col in CATEGORY_COLUMNS + ['Weekday']:
+        arrays[col] = df[col].cat.codes.to_numpy()
+        categories[col] = df[col].cat.categories
+    # Order numbers are plain ints; factorize them so they can be counted like categories
+    arrays['ORDERNUMBER'], categories['ORDERNUMBER'] = pd.factorize(df['ORDERNUMBER'])
+    return arrays, categories
+
+def category_mask(data_version, col, selected):
+    """Rows of a categorical column whose value is selected, compared on integer codes"""
+    arrays, categories = load_arrays(data_version)
+    codes = categories[col].get_indexer(list(selected))
+    return np.isin(arrays[col], codes[codes >= 0])
+
+def filter_mask(data_version, years, products, deal_sizes, countries):
+    """Boolean row mask of the raw data for the sidebar filter selections"""
+    arrays, _ = load_arrays(data_version)
+    return np.logical_and.reduce((
+        np.isin(arrays['Year'], np.array(years, dtype=arrays['Year'].dtype)),
+        category_mask(data_version, 'PRODUCTLINE', products),
+        category_mask(data_version, 'DEALSIZE', deal_sizes),
+        category_mask(data_version, 'COUNTRY', countries)
+    ))
+
+def filter_data(df, data_version, years, products, deal_sizes, countries):
+    """Return the rows matching the sidebar filter selections"""
+    return df[filter_mask(data_version, years, products, deal_sizes, countries)]
+
+# Filtered column arrays: sales and quantity values plus the integer codes per column
+FilteredView = namedtuple('FilteredView', ['orderdate', 'sales', 'qty', 'codes'])
+
+@st.cache_resource(max_entries=16)
+def build_view(data_version, years, products, deal_sizes, countries):
+    """Contiguous filtered arrays, built once per filter selection and shared by every aggregation"""
+    arrays, _ = load_arrays(data_version)
+    mask = filter_mask(data_version, years, products, deal_sizes, countries)
+    # Boolean indexing copies, so every array here is C-contiguous
+    return FilteredView(
+        orderdate=arrays['ORDERDATE'][mask],
+        sales=arrays['SALES'][mask],
+        qty=arrays['QUANTITYORDERED'][mask],
+        codes={col: arrays[col][mask] for col in CATEGORY_COLUMNS + ['Weekday', 'ORDERNUMBER']}
+    )
+
+def sales_by_category(col, data_version, years, products, deal_sizes, countries, observed=True):
+    """Total sales per category of col over the filtered rows, in a single bincount pass"""
+    _, categories = load_arrays(data_version)
+    view = build_view(data_version, years, products, deal_sizes, countries)
+    codes = view.codes[col]
+    n_categories = len(categories[col])
+    totals = pd.Series(
+        np.bincount(codes, weights=view.sales, minlength=n_categories),
+        index=categories[col]
+    )
+    if observed:
+        # Drop categories with no rows in the selection, like a groupby would
+        totals = totals[np.bincount(codes, minlength=n_categories) > 0]
+    return totals
+
+def category_stats(col, data_version, years, products, deal_sizes, countries):
+    """Per category sales total, row count, quantity total and distinct orders over the filtered rows"""
+    _, categories = load_arrays(data_version)
+    view = build_view(data_version, years, products, deal_sizes, countries)
+    codes = view.codes[col]
+    n_groups = len(categories[col])
+    n_orders = len(categories['ORDERNUMBER'])
+    
+    counts = np.bincount(codes, minlength=n_groups)
+    # Distinct (category, order) pair keys give the distinct orders per category; memory
+    # stays proportional to the rows, unlike a categories x orders bitmap
+    pair_keys = np.unique(codes.astype(np.int64) * n_orders + view.codes['ORDERNUMBER'])
+    
+    stats = pd.DataFrame({
+        # SALES are whole cents, so rounding drops the summation error before the means are taken
+        'Total Sales': np.bincount(codes, weights=view.sales, minlength=n_groups).round(2),
+        'Count': counts,
+        'Total Quantity': np.bincount(codes, weights=view.qty, minlength=n_groups).astype(np.int64),
+        'Unique Orders': np.bincount(pair_keys // n_orders, minlength=n_groups)
+    }, index=pd.Index(categories[col], name=col))
+    return stats[counts > 0]
+
+def top_k_positions(values, k):
+    """Positions of the k largest values, largest first, without sorting the whole array"""
+    if len(values) > k:
+        positions = np.argpartition(-values, k - 1)[:k]
+    else:
+        positions = np.arange(len(values))
+    return positions[np.argsort(-values[positions], kind='stable')]
+
+def top_k(series, k):
+    """The k largest entries of a Series, largest first"""
+    return series.iloc[top_k_positions(series.to_numpy(), k)]
+
+def get_filtered_data(data_version, years, products, deal_sizes, countries):
+    """Re-derive the filtered data from the cached raw data"""
+    return filter_data(load_data(data_version), data_version, years, products, deal_sizes, countries)
+
+def resample_sales(freq, data_version, years, products, deal_sizes, countries):
+    """Total sales per calendar period of ORDERDATE, skipping periods with no rows"""
+    view = build_view(data_version, years, products, deal_sizes, countries)
+    sales = pd.Series(view.sales, index=pd.DatetimeIndex(view.orderdate, name='ORDERDATE'), name='SALES')
+    periods = sales.resample(freq)
+    totals = periods.sum()
+    return totals[periods.count() > 0]
+
+# Cached aggregations, keyed by the filter selections (passed as tuples)
+@st.cache_data
+def agg_kpis(data_version, years, products, deal_sizes, countries):
+    """Total sales, distinct orders, average sale, distinct customers and distinct products"""
+    _, categories = load_arrays(data_version)
+    view = build_view(data_version, years, products, deal_sizes, countries)
+    
+    def n_distinct(col):
+        # Presence bitmap over the category codes instead of a hash-based nunique
+        return int(np.count_nonzero(np.bincount(view.codes[col], minlength=len(categories[col]))))
+    
+    total_sales = float(view.sales.sum())
+    return (
+        total_sales,
+        n_distinct('ORDERNUMBER'),
+        total_sales / view.sales.size,
+        n_distinct('CUSTOMERNAME'),
+        n_distinct('PRODUCTCODE')
+    )
+
+@st.cache_data
+def agg_by_productline(data_version, years, products, deal_sizes, countries):
+    """Total sales per product line, largest first"""
+    return sales_by_category('PRODUCTLINE', data_version, years, products, deal_sizes, countries).sort_values(ascending=False)
+
+@st.cache_data
+def agg_by_dealsize(data_version, years, products, deal_sizes, countries):
+    """Total sales per deal size"""
+    return sales_by_category('DEALSIZE', data_version, years, products, deal_sizes, countries)
+
+@st.cache_data
+def agg_top_countries(data_version, years, products, deal_sizes, countries):
+    """Top 15 countries by total sales"""
+    return top_k(sales_by_category('COUNTRY', data_version, years, products, deal_sizes, countries), 15)
+
+@st.cache_data
+def agg_top_products(data_version, years, products, deal_sizes, countries):
+    """Top 10 product codes by total sales"""
+    return top_k(sales_by_category('PRODUCTCODE', data_version, years, products, deal_sizes, countries), 10)
+
+@st.cache_data
+def agg_product_summary(data_version, years, products, deal_sizes, countries):
+    """Per product line performance summary table"""
+    stats = category_stats('PRODUCTLINE', data_version, years, products, deal_sizes, countries)
+    product_summary = pd.DataFrame({
+        'Total Sales': stats['Total Sales'],
+        'Avg Sale': stats['Total Sales'] / stats['Count'],
+        'Total Transactions': stats['Count'],
+        'Total Quantity': stats['Total Quantity'],
+        'Unique Orders': stats['Unique Orders']
+    }).round(2)
+    return product_summary.sort_values('Total Sales', ascending=False)
+
+@st.cache_data
+def agg_top_customers(data_version, years, products, deal_sizes, countries):
+    """Top 15 customers by total sales"""
+    return top_k(sales_by_category('CUSTOMERNAME', data_version, years, products, deal_sizes, countries), 15)
+
+@st.cache_data
+def agg_customer_orders(data_version, years, products, deal_sizes, countries):
+    """Top 15 customers by number of distinct orders"""
+    customer_orders = category_stats('CUSTOMERNAME', data_version, years, products, deal_sizes, countries)['Unique Orders']
+    return top_k(customer_orders, 15)
+
+@st.cache_data
+def agg_customer_analysis(data_version, years, products, deal_sizes, countries):
+    """Per customer performance table for the top 20 customers by sales"""
+    stats = category_stats('CUSTOMERNAME', data_version, years, products, deal_sizes, countries)
+    stats = stats.iloc[top_k_positions(stats['Total Sales'].to_numpy(), 20)]
+    customer_analysis = pd.DataFrame({
+        'Total Sales': stats['Total Sales'],
+        'Avg Order Value': stats['Total Sales'] / stats['Count'],
+        'Total Orders': stats['Unique Orders'],
+        'Total Quantity': stats['Total Quantity']
+    }).round(2)
+    
+    customer_analysis['Revenue per Order'] = (customer_analysis['Total Sales'] / customer_analysis['Total Orders']).round(2)
+    return customer_analysis
+
+@st.cache_data
+def agg_monthly_sales(data_version, years, products, deal_sizes, countries):
+    """Total sales per calendar month"""
+    monthly_sales = resample_sales('MS', data_version, years, products, deal_sizes, countries)
+    return monthly_sales.rename_axis('Date').reset_index()
+
+@st.cache_data
+def agg_quarterly_sales(data_version, years, products, deal_sizes, countries):
+    """Total sales per quarter, labelled as YYYY-Qn"""
+    quarterly_sales = resample_sales('QS', data_version, years, products, deal_sizes, countries)
+    quarter_start = quarterly_sales.index
+    quarterly_sales = quarterly_sales.reset_index(drop=True).to_frame()
+    quarterly_sales['Period'] = quarter_start.year.astype(str) + '-Q' + quarter_start.quarter.astype(str)
+    return quarterly_sales
+
+@st.cache_data
+def agg_weekday_sales(data_version, years, products, deal_sizes, countries):
+    """Total sales per day of week, Monday first"""
+    return sales_by_category('Weekday', data_version, years, products, deal_sizes, countries, observed=False)
+
+@st.cache_data(max_entries=8)
+def convert_df_to_excel(data_version, years, products, deal_sizes, countries):
+    """Excel workbook with the filtered data and a KPI summary sheet"""
+    df = get_filtered_data(data_version, years, products, deal_sizes, countries)
+    output = io.BytesIO()
+    # xlsxwriter's constant_memory mode is not used: pandas writes cells column by
+    # column, and constant_memory only keeps the current row
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, sheet_name='Filtered Data', index=False)
         
-        # Data preprocessing
-        df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'])
-        df['Year'] = df['ORDERDATE'].dt.year
-        df['Month'] = df['ORDERDATE'].dt.month
-        df['MonthName'] = df['ORDERDATE'].dt.month_name()
-        df['Quarter'] = df['ORDERDATE'].dt.quarter
-        df['Weekday'] = df['ORDERDATE'].dt.day_name()
+        # Add summary sheet
+        summary_data = {
+            'Metric': ['Total Sales', 'Total Orders', 'Avg Order Value', 'Total Customers', 'Total Products'],
+            'Value': list(agg_kpis(data_version, years, products, deal_sizes, countries))
+        }
+        summary_df = pd.DataFrame(summary_data)
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    
+    return output.getvalue()
+
+@st.cache_data(max_entries=8)
+def convert_df_to_csv(data_version, years, products, deal_sizes, countries):
+    """CSV bytes of the filtered data"""
+    # DataFrame.to_csv rather than pyarrow's writer, which quotes every string value
+    df = get_filtered_data(data_version, years, products, deal_sizes, countries)
+    output = io.BytesIO()
+    df.to_csv(output, index=False)
+    return output.getvalue()
+
+def bar_figure(series, title, value_title, label_title, colorscale, horizontal=False):
+    """Bar chart of a Series' values per index label, colored by value"""
+    values = series.to_numpy()
+    labels = series.index
+    fig = go.Figure(go.Bar(
+        x=values if horizontal else labels,
+        y=labels if horizontal else values,
+        orientation='h' if horizontal else 'v',
+        marker=dict(color=values, colorscale=colorscale, showscale=True, colorbar=dict(title=value_title))
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=value_title if horizontal else label_title,
+        yaxis_title=label_title if horizontal else value_title
+    )
+    return fig
+
+def quantity_price_figure(df):
+    """WebGL scatter of quantity vs price, binned to a sales heatmap for large selections"""
+    qty = df['QUANTITYORDERED'].to_numpy()
+    price = df['PRICEEACH'].to_numpy()
+    sales = df['SALES'].to_numpy()
+    
+    if len(df) > SCATTER_MAX_POINTS:
+        totals, qty_edges, price_edges = np.histogram2d(qty, price, bins=64, weights=sales)
+        counts, _, _ = np.histogram2d(qty, price, bins=[qty_edges, price_edges])
+        # Leave bins without orders blank instead of drawing them as the lowest sales colour
+        totals[counts == 0] = np.nan
+        fig = go.Figure(go.Heatmap(
+            z=totals.T,
+            x=(qty_edges[:-1] + qty_edges[1:]) / 2,
+            y=(price_edges[:-1] + price_edges[1:]) / 2,
+            colorscale='Viridis',
+            colorbar=dict(title='Sales ($)')
+        ))
+        title = "Quantity vs Price (Color = Sales)"
+    else:
+        fig = go.Figure()
+        # Same bubble scaling as px.scatter: marker area proportional to sales, max 20px
+        sizeref = 2.0 * sales.max() / (20 ** 2)
+        product_codes = df['PRODUCTLINE'].cat.codes.to_numpy()
+        for code, product in enumerate(df['PRODUCTLINE'].cat.categories):
+            rows = product_codes == code
+            if not rows.any():
+                continue
+            fig.add_trace(go.Scattergl(
+                x=qty[rows],
+                y=price[rows],
+                mode='markers',
+                name=product,
+                marker=dict(size=sales[rows], sizemode='area', sizeref=sizeref, sizemin=1)
+            ))
+        fig.update_layout(legend_title_text='PRODUCTLINE', showlegend=True)
+        title = "Quantity vs Price (Size = Sales)"
+    
+    fig.update_layout(title=title, xaxis_title='Quantity Ordered', yaxis_title='Price Each ($)')
+    return fig
+
+@st.fragment
+def render_sales_tab(filters):
+    """Sales Analysis tab: product line, deal size and country sales"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Sales by Product Line")
+        product_sales = agg_by_productline(*filters)
         
-        # Remove columns with high missing values if they exist
-        columns_to_drop = ['ADDRESSLINE2', 'STATE', 'TERRITORY']
-        existing_columns = [col for col in columns_to_drop if col in df.columns]
-        if existing_columns:
-            df.drop(columns=existing_columns, inplace=True)
+        fig = bar_figure(
+            product_sales,
+            title="Sales Revenue by Product Line",
+            value_title='Sales ($)',
+            label_title='Product Line',
+            colorscale='viridis',
+            horizontal=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Sales by Deal Size")
+        deal_sales = agg_by_dealsize(*filters)
         
-        return df
-    except FileNotFoundError:
-        st.error("Data file not found. Please ensure 'sales_data_sample (1).csv' is in the correct directory.")
-        return None
+        fig = go.Figure(go.Pie(
+            values=deal_sales.values, 
+            labels=deal_sales.index,
+            marker=dict(colors=qualitative.Set3)
+        ))
+        fig.update_layout(title="Sales Distribution by Deal Size", showlegend=True)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Geographic Analysis
+    st.subheader("🌍 Geographic Sales Distribution")
+    country_sales = agg_top_countries(*filters)
+    
+    fig = bar_figure(
+        country_sales,
+        title="Top 15 Countries by Sales Revenue",
+        value_title='Sales ($)',
+        label_title='Country',
+        colorscale='plasma'
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def render_product_tab(filters):
+    """Product Performance tab: top products, quantity vs price and product line summary"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Top 10 Products by Revenue")
+        top_products = agg_top_products(*filters)
+        
+        fig = bar_figure(
+            top_products,
+            title="Top 10 Products by Sales",
+            value_title='Sales ($)',
+            label_title='Product Code',
+            colorscale='blues',
+            horizontal=True
+        )
+        fig.update_layout(height=500)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Quantity vs Price Analysis")
+        fig = quantity_price_figure(get_filtered_data(*filters))
+        fig.update_layout(height=500)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Product Line Performance Table
+    st.subheader("📋 Product Line Performance Summary")
+    product_summary = agg_product_summary(*filters)
+    st.dataframe(product_summary, use_container_width=True)
+
+@st.fragment
+def render_customer_tab(filters):
+    """Customer Insights tab: top customers, order frequency and customer table"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Top 15 Customers by Revenue")
+        top_customers = agg_top_customers(*filters)
+        
+        fig = bar_figure(
+            top_customers,
+            title="Top 15 Customers by Revenue",
+            value_title='Sales ($)',
+            label_title='Customer Name',
+            colorscale='greens',
+            horizontal=True
+        )
+        fig.update_layout(height=600)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Customer Order Frequency")
+        customer_orders = agg_customer_orders(*filters)
+        
+        fig = bar_figure(
+            customer_orders,
+            title="Top 15 Customers by Order Count",
+            value_title='Number of Orders',
+            label_title='Customer Name',
+            colorscale='oranges',
+            horizontal=True
+        )
+        fig.update_layout(height=600)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Customer Analysis Table
+    st.subheader("👥 Customer Performance Analysis")
+    customer_analysis = agg_customer_analysis(*filters)
+    st.dataframe(customer_analysis, use_container_width=True)
+
+@st.fragment
+def render_time_tab(filters):
+    """Time Analysis tab: monthly, quarterly and weekday sales"""
+    # Monthly Sales Trend
+    st.subheader("📈 Monthly Sales Trend")
+    monthly_sales = agg_monthly_sales(*filters)
+    
+    fig = go.Figure(go.Scatter(x=monthly_sales['Date'], y=monthly_sales['SALES'], mode='lines'))
+    fig.update_layout(title="Monthly Sales Trend Over Time", xaxis_title='Month-Year', yaxis_title='Sales ($)')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Sales by Quarter")
+        quarterly_sales = agg_quarterly_sales(*filters)
+        
+        fig = bar_figure(
+            quarterly_sales.set_index('Period')['SALES'],
+            title="Quarterly Sales Performance",
+            value_title='Sales ($)',
+            label_title='Quarter',
+            colorscale='viridis'
+        )
+        fig.update_layout(xaxis_tickangle=-45)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Sales by Day of Week")
+        weekday_sales = agg_weekday_sales(*filters)
+        
+        fig = bar_figure(
+            weekday_sales,
+            title="Sales by Day of Week",
+            value_title='Sales ($)',
+            label_title='Day of Week',
+            colorscale='plasma'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def render_data_info(filters):
+    """Data info button; clicking it reruns only this fragment"""
+    if st.button("ℹ️ Show Data Info"):
+        filtered_df = get_filtered_data(*filters)
+        st.write(f"**Filtered Dataset Shape:** {filtered_df.shape[0]} rows × {filtered_df.shape[1]} columns")
+        st.write(f"**Date Range:** {filtered_df['ORDERDATE'].min().date()} to {filtered_df['ORDERDATE'].max().date()}")
+        st.write(f"**Total Sales in Selection:** ${filtered_df['SALES'].sum():,.2f}")
+
+@st.fragment
+def render_data_preview(filters):
+    """Filtered data preview; toggling it reruns only this fragment"""
+    if st.checkbox("Show filtered data preview"):
+        filtered_df = get_filtered_data(*filters)
+        st.dataframe(
+            filtered_df.head(100), 
+            use_container_width=True,
+            height=400
+        )
+        st.write(f"Showing first 100 rows of {len(filtered_df)} total filtered records")
 
 # Main dashboard function
 def main():
@@ -68,9 +610,11 @@ def main():
     st.markdown('<h1 class="main-header">📊 Sales Analysis Dashboard</h1>', unsafe_allow_html=True)
     
     # Load data
-    df = load_data()
-    if df is None:
+    data_version = current_data_version()
+    if data_version is None:
+        st.error(f"Data file not found. Please ensure '{DATA_FILE}' is in the correct directory.")
         return
+    df = load_data(data_version)
     
     # Sidebar filters
     st.sidebar.title("🔍 Filters")
@@ -113,238 +657,47 @@ def main():
     )
     
     # Apply filters
-    filtered_df = df[
-        (df['Year'].isin(selected_years)) & 
-        (df['PRODUCTLINE'].isin(selected_products)) &
-        (df['DEALSIZE'].isin(selected_deal_sizes)) &
-        (df['COUNTRY'].isin(selected_countries))
-    ]
-    
-    if filtered_df.empty:
+    filters = (data_version, tuple(selected_years), tuple(selected_products), tuple(selected_deal_sizes), tuple(selected_countries))
+    if build_view(*filters).sales.size == 0:
         st.warning("No data matches the selected filters. Please adjust your selections.")
         return
     
     # Key Metrics Section
     st.markdown("## 📈 Key Performance Indicators")
     
+    total_sales, total_orders, avg_order_value, total_customers, total_products = agg_kpis(*filters)
+    
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_sales = filtered_df['SALES'].sum()
         st.metric("💰 Total Sales", f"${total_sales:,.0f}")
     
     with col2:
-        total_orders = filtered_df['ORDERNUMBER'].nunique()
         st.metric("📦 Total Orders", f"{total_orders:,}")
     
     with col3:
-        avg_order_value = filtered_df['SALES'].mean()
         st.metric("💵 Avg Order Value", f"${avg_order_value:,.0f}")
     
     with col4:
-        total_customers = filtered_df['CUSTOMERNAME'].nunique()
         st.metric("👥 Total Customers", f"{total_customers:,}")
     
     with col5:
-        total_products = filtered_df['PRODUCTCODE'].nunique()
         st.metric("🛍️ Total Products", f"{total_products:,}")
     
     st.markdown("---")
     
     # Charts Section
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Sales Analysis", "🏷️ Product Performance", "👥 Customer Insights", "📅 Time Analysis"])
-    
-    with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Sales by Product Line")
-            product_sales = filtered_df.groupby('PRODUCTLINE')['SALES'].sum().sort_values(ascending=False)
-            
-            fig = px.bar(
-                x=product_sales.values, 
-                y=product_sales.index,
-                orientation='h',
-                title="Sales Revenue by Product Line",
-                labels={'x': 'Sales ($)', 'y': 'Product Line'},
-                color=product_sales.values,
-                color_continuous_scale='viridis'
-            )
-            fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.subheader("Sales by Deal Size")
-            deal_sales = filtered_df.groupby('DEALSIZE')['SALES'].sum()
-            
-            fig = px.pie(
-                values=deal_sales.values, 
-                names=deal_sales.index,
-                title="Sales Distribution by Deal Size",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Geographic Analysis
-        st.subheader("🌍 Geographic Sales Distribution")
-        country_sales = filtered_df.groupby('COUNTRY')['SALES'].sum().sort_values(ascending=False).head(15)
-        
-        fig = px.bar(
-            x=country_sales.index, 
-            y=country_sales.values,
-            title="Top 15 Countries by Sales Revenue",
-            labels={'x': 'Country', 'y': 'Sales ($)'},
-            color=country_sales.values,
-            color_continuous_scale='plasma'
-        )
-        fig.update_layout(xaxis_tickangle=-45, height=400)
-        st.plotly_chart(fig, use_container_width=True)
+    view = st.radio("View", VIEWS, horizontal=True, key='view', label_visibility='collapsed')
     
-    with tab2:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Top 10 Products by Revenue")
-            top_products = filtered_df.groupby('PRODUCTCODE')['SALES'].sum().sort_values(ascending=False).head(10)
-            
-            fig = px.bar(
-                x=top_products.values, 
-                y=top_products.index,
-                orientation='h',
-                title="Top 10 Products by Sales",
-                labels={'x': 'Sales ($)', 'y': 'Product Code'},
-                color=top_products.values,
-                color_continuous_scale='blues'
-            )
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.subheader("Quantity vs Price Analysis")
-            fig = px.scatter(
-                filtered_df, 
-                x='QUANTITYORDERED', 
-                y='PRICEEACH',
-                size='SALES',
-                color='PRODUCTLINE',
-                title="Quantity vs Price (Size = Sales)",
-                labels={'QUANTITYORDERED': 'Quantity Ordered', 'PRICEEACH': 'Price Each ($)'}
-            )
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Product Line Performance Table
-        st.subheader("📋 Product Line Performance Summary")
-        product_summary = filtered_df.groupby('PRODUCTLINE').agg({
-            'SALES': ['sum', 'mean', 'count'],
-            'QUANTITYORDERED': 'sum',
-            'ORDERNUMBER': 'nunique'
-        }).round(2)
-        
-        product_summary.columns = ['Total Sales', 'Avg Sale', 'Total Transactions', 'Total Quantity', 'Unique Orders']
-        product_summary = product_summary.sort_values('Total Sales', ascending=False)
-        st.dataframe(product_summary, use_container_width=True)
-    
-    with tab3:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Top 15 Customers by Revenue")
-            top_customers = filtered_df.groupby('CUSTOMERNAME')['SALES'].sum().sort_values(ascending=False).head(15)
-            
-            fig = px.bar(
-                x=top_customers.values, 
-                y=top_customers.index,
-                orientation='h',
-                title="Top 15 Customers by Revenue",
-                labels={'x': 'Sales ($)', 'y': 'Customer Name'},
-                color=top_customers.values,
-                color_continuous_scale='greens'
-            )
-            fig.update_layout(height=600)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.subheader("Customer Order Frequency")
-            customer_orders = filtered_df.groupby('CUSTOMERNAME')['ORDERNUMBER'].nunique().sort_values(ascending=False).head(15)
-            
-            fig = px.bar(
-                x=customer_orders.values, 
-                y=customer_orders.index,
-                orientation='h',
-                title="Top 15 Customers by Order Count",
-                labels={'x': 'Number of Orders', 'y': 'Customer Name'},
-                color=customer_orders.values,
-                color_continuous_scale='oranges'
-            )
-            fig.update_layout(height=600)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Customer Analysis Table
-        st.subheader("👥 Customer Performance Analysis")
-        customer_analysis = filtered_df.groupby('CUSTOMERNAME').agg({
-            'SALES': ['sum', 'mean'],
-            'ORDERNUMBER': 'nunique',
-            'QUANTITYORDERED': 'sum'
-        }).round(2)
-        
-        customer_analysis.columns = ['Total Sales', 'Avg Order Value', 'Total Orders', 'Total Quantity']
-        customer_analysis['Revenue per Order'] = (customer_analysis['Total Sales'] / customer_analysis['Total Orders']).round(2)
-        customer_analysis = customer_analysis.sort_values('Total Sales', ascending=False).head(20)
-        st.dataframe(customer_analysis, use_container_width=True)
-    
-    with tab4:
-        # Monthly Sales Trend
-        st.subheader("📈 Monthly Sales Trend")
-        monthly_sales = filtered_df.groupby(['Year', 'Month'])['SALES'].sum().reset_index()
-        monthly_sales['Date'] = pd.to_datetime(monthly_sales[['Year', 'Month']].assign(day=1))
-        
-        fig = px.line(
-            monthly_sales, 
-            x='Date', 
-            y='SALES',
-            title="Monthly Sales Trend Over Time",
-            labels={'SALES': 'Sales ($)', 'Date': 'Month-Year'}
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Sales by Quarter")
-            quarterly_sales = filtered_df.groupby(['Year', 'Quarter'])['SALES'].sum().reset_index()
-            quarterly_sales['Period'] = quarterly_sales['Year'].astype(str) + '-Q' + quarterly_sales['Quarter'].astype(str)
-            
-            fig = px.bar(
-                quarterly_sales, 
-                x='Period', 
-                y='SALES',
-                title="Quarterly Sales Performance",
-                labels={'SALES': 'Sales ($)', 'Period': 'Quarter'},
-                color='SALES',
-                color_continuous_scale='viridis'
-            )
-            fig.update_layout(xaxis_tickangle=-45, height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.subheader("Sales by Day of Week")
-            weekday_sales = filtered_df.groupby('Weekday')['SALES'].sum().reindex([
-                'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
-            ])
-            
-            fig = px.bar(
-                x=weekday_sales.index, 
-                y=weekday_sales.values,
-                title="Sales by Day of Week",
-                labels={'x': 'Day of Week', 'y': 'Sales ($)'},
-                color=weekday_sales.values,
-                color_continuous_scale='plasma'
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+    # Only the selected view is computed and rendered
+    if view == VIEWS[0]:
+        render_sales_tab(filters)
+    elif view == VIEWS[1]:
+        render_product_tab(filters)
+    elif view == VIEWS[2]:
+        render_customer_tab(filters)
+    elif view == VIEWS[3]:
+        render_time_tab(filters)
     
     # Data Export Section
     st.markdown("---")
@@ -354,30 +707,7 @@ def main():
     
     with col1:
         # Export filtered data to Excel
-        @st.cache_data
-        def convert_df_to_excel(df):
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Filtered Data', index=False)
-                
-                # Add summary sheet
-                summary_data = {
-                    'Metric': ['Total Sales', 'Total Orders', 'Avg Order Value', 'Total Customers', 'Total Products'],
-                    'Value': [
-                        df['SALES'].sum(),
-                        df['ORDERNUMBER'].nunique(),
-                        df['SALES'].mean(),
-                        df['CUSTOMERNAME'].nunique(),
-                        df['PRODUCTCODE'].nunique()
-                    ]
-                }
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            output.seek(0)
-            return output
-        
-        excel_data = convert_df_to_excel(filtered_df)
+        excel_data = convert_df_to_excel(*filters)
         st.download_button(
             label="📊 Download Filtered Data (Excel)",
             data=excel_data,
@@ -386,33 +716,23 @@ def main():
         )
     
     with col2:
-        # Export filtered data to CSV
-        csv_data = filtered_df.to_csv(index=False)
+        # Export filtered data to CSV, generated only when the button is clicked
         st.download_button(
             label="📄 Download Filtered Data (CSV)",
-            data=csv_data,
+            data=lambda: convert_df_to_csv(*filters),
             file_name=f"sales_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
     
     with col3:
         # Show data info
-        if st.button("ℹ️ Show Data Info"):
-            st.write(f"**Filtered Dataset Shape:** {filtered_df.shape[0]} rows × {filtered_df.shape[1]} columns")
-            st.write(f"**Date Range:** {filtered_df['ORDERDATE'].min().date()} to {filtered_df['ORDERDATE'].max().date()}")
-            st.write(f"**Total Sales in Selection:** ${filtered_df['SALES'].sum():,.2f}")
+        render_data_info(filters)
     
     # Data Preview Section
     st.markdown("---")
     st.markdown("## 🔍 Data Preview")
     
-    if st.checkbox("Show filtered data preview"):
-        st.dataframe(
-            filtered_df.head(100), 
-            use_container_width=True,
-            height=400
-        )
-        st.write(f"Showing first 100 rows of {len(filtered_df)} total filtered records")
+    render_data_preview(filters)
 
 # Sidebar info
 def sidebar_info():